@@ -0,0 +1,81 @@
+"""
+Benchmark: local verb conjugation vs. the GPT word-forms path behind /getWordForms.
+
+    python bench_word_forms.py [--llm] [--repeat N] [verb ...]
+
+The GPT side only runs with --llm (it needs OPENAI_API_KEY and costs one completion per verb).
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from morphology import conjugate_verb, strip_diacritics
+
+DEFAULT_VERBS = ["كَتَبَ", "ضرب", "فتح", "شرب", "مد", "وعد", "قال", "باع", "خاف", "دعا", "رمى", "نسي"]
+
+
+def table(word_forms):
+    """
+    Maps (aspect, gender, number, person, voice) to the undiacritized form, for comparing outputs.
+    """
+    result = {}
+    for entry in word_forms:
+        rep = entry["formRepresentations"]
+        key = (rep["aspect"], rep["gender"], rep["numberWordForm"], rep["person"], rep["voice"])
+        result.setdefault(key, strip_diacritics(rep["form"]))
+    return result
+
+
+def bench_local(verbs, repeat):
+    print(f"{'verb':<8}{'forms':>6}{'mean us':>10}{'p99 us':>10}")
+    for verb in verbs:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            word_forms = conjugate_verb(verb)
+            timings.append((time.perf_counter() - started) * 1e6)
+        timings.sort()
+        forms = len(word_forms) if word_forms is not None else "-"
+        p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+        print(f"{verb:<8}{forms:>6}{statistics.mean(timings):>10.1f}{p99:>10.1f}")
+
+
+def bench_llm(verbs):
+    # Imported lazily: main needs the FastAPI/OpenAI stack and the audio directory
+    from main import generate_response_from_gpt, parse_response_to_json, word_forms_prompt
+
+    async def fetch_all():
+        # One event loop for every verb: the shared async client's connections are bound to it
+        results = []
+        for verb in verbs:
+            started = time.perf_counter()
+            result = await generate_response_from_gpt(word_forms_prompt(verb), "wordForms")
+            results.append((result, time.perf_counter() - started))
+        return results
+
+    print(f"{'verb':<8}{'forms':>6}{'seconds':>10}{'agree':>8}")
+    for verb, (result, elapsed) in zip(verbs, asyncio.run(fetch_all())):
+        llm_forms = parse_response_to_json(result, "wordForms")["wordForms"]
+
+        local_forms = conjugate_verb(verb)
+        agree = "-"
+        if local_forms is not None:
+            local, llm = table(local_forms), table(llm_forms)
+            shared = [key for key in llm if key in local]
+            if shared:
+                agree = f"{sum(local[key] == llm[key] for key in shared) / len(shared):.0%}"
+        print(f"{verb:<8}{len(llm_forms):>6}{elapsed:>10.2f}{agree:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("verbs", nargs="*", default=DEFAULT_VERBS)
+    parser.add_argument("--repeat", type=int, default=1000)
+    parser.add_argument("--llm", action="store_true", help="also time the GPT path")
+    args = parser.parse_args()
+
+    bench_local(args.verbs, args.repeat)
+    if args.llm:
+        print()
+        bench_llm(args.verbs)
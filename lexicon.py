@@ -0,0 +1,173 @@
+"""
+Persistent SQLite store for parsed endpoint results.
+
+Every result is kept as JSON keyed by (word, endpoint type). Headwords, word
+forms and stems go into a normalized-prefix index for autocomplete, and all
+text in a result goes into an FTS5 index for full-text search.
+"""
+import json
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from morphology import strip_diacritics
+
+# Endpoint types whose "form" values are single words worth offering as completions
+WORD_FORM_TYPES = {"wordForms", "stems"}
+
+NORMALIZED_LETTERS = str.maketrans({"أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا", "ى": "ي", "ة": "ه", "ؤ": "و", "ئ": "ي"})
+
+
+def normalize(text: str) -> str:
+    """
+    Search key for a word: no diacritics, unified alif/yaa/taa marbuta and hamza seats, lowercase.
+    """
+    return " ".join(strip_diacritics(text).translate(NORMALIZED_LETTERS).lower().split())
+
+
+def _strings(value):
+    """
+    Yields every string in a parsed result, skipping audio URLs.
+    """
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key != "audio":
+                yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+    elif isinstance(value, str) and value != "null":
+        yield value
+
+
+def _forms(value):
+    if isinstance(value, dict):
+        if isinstance(value.get("form"), str):
+            yield value["form"]
+        for item in value.values():
+            yield from _forms(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _forms(item)
+
+
+def _fts_query(query: str) -> str:
+    # Quote every token so user input can't inject FTS syntax; the last one is a prefix
+    tokens = ['"' + token.replace('"', '""') + '"' for token in normalize(query).split()]
+    if tokens:
+        tokens[-1] += "*"
+    return " ".join(tokens)
+
+
+class LexiconStore:
+    """
+    Thread-safe wrapper around the lexicon database.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS results (
+                word TEXT NOT NULL,
+                endpoint_type TEXT NOT NULL,
+                normalized TEXT NOT NULL,
+                result TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (word, endpoint_type)
+            );
+            CREATE TABLE IF NOT EXISTS forms (
+                normalized TEXT NOT NULL,
+                form TEXT NOT NULL,
+                word TEXT NOT NULL,
+                endpoint_type TEXT NOT NULL,
+                UNIQUE (normalized, form, word, endpoint_type)
+            );
+            CREATE INDEX IF NOT EXISTS forms_word ON forms (word, endpoint_type);
+        """)
+        try:
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS results_fts USING fts5("
+                "content, word UNINDEXED, endpoint_type UNINDEXED)")
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5: text search falls back to LIKE
+            self.has_fts = False
+        self._conn.commit()
+
+    def get(self, word: str, endpoint_type: str) -> Optional[Tuple[dict, float]]:
+        """
+        Returns (result, age in seconds) for a stored result, or None.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, updated_at FROM results WHERE word = ? AND endpoint_type = ?",
+                (word, endpoint_type)).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), max(0.0, time.time() - row[1])
+
+    def save(self, word: str, endpoint_type: str, result: dict, replace=True):
+        """
+        Stores a parsed result and indexes its forms and text. With replace=False an
+        existing result is kept as is.
+        """
+        normalized = normalize(word)
+        forms = {(normalized, word)}
+        if endpoint_type in WORD_FORM_TYPES:
+            forms.update((normalize(form), form) for form in _forms(result))
+        with self._lock, self._conn:
+            if not replace and self._conn.execute(
+                    "SELECT 1 FROM results WHERE word = ? AND endpoint_type = ?",
+                    (word, endpoint_type)).fetchone():
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (word, endpoint_type, normalized, json.dumps(result, ensure_ascii=False), time.time()))
+            self._conn.execute(
+                "DELETE FROM forms WHERE word = ? AND endpoint_type = ?", (word, endpoint_type))
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO forms VALUES (?, ?, ?, ?)",
+                [(key, form, word, endpoint_type) for key, form in forms if key])
+            if self.has_fts:
+                self._conn.execute(
+                    "DELETE FROM results_fts WHERE word = ? AND endpoint_type = ?", (word, endpoint_type))
+                self._conn.execute(
+                    "INSERT INTO results_fts VALUES (?, ?, ?)",
+                    (normalize(" ".join(_strings(result))), word, endpoint_type))
+
+    def autocomplete(self, prefix: str, limit=10) -> List[dict]:
+        """
+        Words and word forms starting with the prefix, shortest first.
+        """
+        key = normalize(prefix)
+        if not key:
+            return []
+        # Range scan on the normalized index instead of LIKE, which can't use it for Arabic text
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT form, word FROM forms WHERE normalized >= ? AND normalized < ? "
+                "GROUP BY form, word ORDER BY length(normalized), form LIMIT ?",
+                (key, key + "\U0010ffff", limit)).fetchall()
+        return [{"form": form, "word": word} for form, word in rows]
+
+    def search(self, query: str, limit=10) -> List[dict]:
+        """
+        Stored results whose text matches every word of the query (the last one as a prefix).
+        """
+        if not normalize(query):
+            return []
+        with self._lock:
+            if self.has_fts:
+                rows = self._conn.execute(
+                    "SELECT word, endpoint_type FROM results_fts WHERE results_fts MATCH ? "
+                    "ORDER BY rank LIMIT ?", (_fts_query(query), limit)).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT word, endpoint_type FROM results WHERE result LIKE ? LIMIT ?",
+                    (f"%{query}%", limit)).fetchall()
+        return [{"word": word, "endpointType": endpoint_type} for word, endpoint_type in rows]
@@ -1,15 +1,22 @@
 from typing import Optional
-from fastapi import FastAPI, HTTPException, Form
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, HTTPException, Form, Request
+from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.responses import FileResponse
 from gtts import gTTS
 import openai
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 import os
 import hashlib
 import logging
 import asyncio
 import datetime
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait as wait_futures
+from morphology import conjugate_verb
+from phonetics import fill_phonetic_fields, is_vocalized, transcribe
+from lexicon import LexiconStore
 
 # Initialize FastAPI
 app = FastAPI()
@@ -27,6 +34,478 @@ os.makedirs(SAVE_PATH, exist_ok=True)
 # Base URL for your service (adjust for your deployment environment)
 BASE_URL = "https://fastapi-app-gx34.onrender.com"
 
+# Upstream (OpenAI) resilience settings
+UPSTREAM_TIMEOUT_SECONDS = float(os.environ.get("UPSTREAM_TIMEOUT_SECONDS", "30"))
+BREAKER_WINDOW_SIZE = int(os.environ.get("BREAKER_WINDOW_SIZE", "20"))
+BREAKER_MIN_CALLS = int(os.environ.get("BREAKER_MIN_CALLS", "5"))
+BREAKER_FAILURE_RATE = float(os.environ.get("BREAKER_FAILURE_RATE", "0.5"))
+BREAKER_SLOW_CALL_SECONDS = float(os.environ.get("BREAKER_SLOW_CALL_SECONDS", "15"))
+BREAKER_SLOW_CALL_RATE = float(os.environ.get("BREAKER_SLOW_CALL_RATE", "0.5"))
+BREAKER_RECOVERY_SECONDS = float(os.environ.get("BREAKER_RECOVERY_SECONDS", "30"))
+
+# Lexical results cache (stale-while-revalidate)
+LEXICAL_CACHE_FRESH_SECONDS = float(os.environ.get("LEXICAL_CACHE_FRESH_SECONDS", "3600"))
+LEXICAL_CACHE_MAX_ENTRIES = int(os.environ.get("LEXICAL_CACHE_MAX_ENTRIES", "2048"))
+
+# Optional request hedging: a duplicate upstream call is sent once the first one is slower
+# than HEDGE_PERCENTILE of recent calls, for at most HEDGE_BUDGET of the calls per endpoint
+HEDGING_ENABLED = os.environ.get("HEDGING_ENABLED", "false").lower() in ("1", "true", "yes")
+HEDGE_PERCENTILE = float(os.environ.get("HEDGE_PERCENTILE", "95"))
+HEDGE_BUDGET = float(os.environ.get("HEDGE_BUDGET", "0.1"))
+HEDGE_MIN_SAMPLES = int(os.environ.get("HEDGE_MIN_SAMPLES", "20"))
+HEDGE_WINDOW = int(os.environ.get("HEDGE_WINDOW", "200"))
+HEDGE_TTS_WORKERS = int(os.environ.get("HEDGE_TTS_WORKERS", "32"))
+
+# Persistent lexicon of every parsed result, searchable through /search
+LEXICON_DB_PATH = os.environ.get("LEXICON_DB_PATH", os.path.join(SAVE_PATH, "lexicon.db"))
+# Freshness window of results loaded from the lexicon; lexical data rarely changes (default 30 days)
+LEXICON_FRESH_SECONDS = float(os.environ.get("LEXICON_FRESH_SECONDS", str(30 * 24 * 3600)))
+
+# Admission control for the get* routes, per endpoint class
+ADMISSION_LLM_MAX_IN_FLIGHT = int(os.environ.get("ADMISSION_LLM_MAX_IN_FLIGHT", "16"))
+ADMISSION_LLM_MAX_QUEUE = int(os.environ.get("ADMISSION_LLM_MAX_QUEUE", "64"))
+ADMISSION_LLM_QUEUE_TIMEOUT_SECONDS = float(os.environ.get("ADMISSION_LLM_QUEUE_TIMEOUT_SECONDS", "10"))
+ADMISSION_TTS_MAX_IN_FLIGHT = int(os.environ.get("ADMISSION_TTS_MAX_IN_FLIGHT", "8"))
+ADMISSION_TTS_MAX_QUEUE = int(os.environ.get("ADMISSION_TTS_MAX_QUEUE", "32"))
+ADMISSION_TTS_QUEUE_TIMEOUT_SECONDS = float(os.environ.get("ADMISSION_TTS_QUEUE_TIMEOUT_SECONDS", "10"))
+ADMISSION_RETRY_AFTER_SECONDS = int(os.environ.get("ADMISSION_RETRY_AFTER_SECONDS", "2"))
+
+# Optional per-client rate limit (keyed by X-API-Key, else client IP); 0 disables it
+RATE_LIMIT_PER_MINUTE = float(os.environ.get("RATE_LIMIT_PER_MINUTE", "0"))
+RATE_LIMIT_BURST = int(os.environ.get("RATE_LIMIT_BURST", "10"))
+RATE_LIMIT_MAX_CLIENTS = int(os.environ.get("RATE_LIMIT_MAX_CLIENTS", "10000"))
+# Comma-separated API keys that get their own rate-limit bucket; unknown keys are keyed by IP
+RATE_LIMIT_API_KEYS = {key.strip() for key in os.environ.get("RATE_LIMIT_API_KEYS", "").split(",") if key.strip()}
+# Whether a trusted reverse proxy (Render's) appends the client address to X-Forwarded-For
+TRUST_PROXY_HEADERS = os.environ.get("TRUST_PROXY_HEADERS", "true").lower() in ("1", "true", "yes")
+
+
+class CircuitBreaker:
+    """
+    Tracks the outcome of recent upstream calls and fails fast while the upstream is unhealthy.
+
+    The breaker opens when the share of failed or slow calls in the sliding window crosses
+    its threshold, stays open for `recovery_seconds`, then lets a single probe through
+    (half-open). A healthy probe closes the breaker again, anything else re-opens it.
+
+    Callers pass the ticket returned by `allow_request` back to `record_success` /
+    `record_failure`, so only the probe itself can settle the half-open state.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    # Ticket for calls admitted while the breaker is closed
+    REGULAR_CALL = object()
+
+    def __init__(self, name: str, window_size=BREAKER_WINDOW_SIZE, min_calls=BREAKER_MIN_CALLS,
+                 failure_rate=BREAKER_FAILURE_RATE, slow_call_seconds=BREAKER_SLOW_CALL_SECONDS,
+                 slow_call_rate=BREAKER_SLOW_CALL_RATE, recovery_seconds=BREAKER_RECOVERY_SECONDS):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.recovery_seconds = recovery_seconds
+        self._outcomes = deque(maxlen=window_size)  # (failed, slow) per call
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probe_started_at = None
+        self._probe_ticket = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh_state()
+            return self._state
+
+    def allow_request(self):
+        """
+        Returns a ticket if a call may be sent upstream right now, or None.
+        """
+        with self._lock:
+            self._refresh_state()
+            if self._state == self.CLOSED:
+                return self.REGULAR_CALL
+            if self._state == self.HALF_OPEN:
+                # Only one probe at a time; a probe that never reported back is given up on
+                now = time.monotonic()
+                if (self._probe_started_at is None
+                        or now - self._probe_started_at >= self.recovery_seconds):
+                    self._probe_started_at = now
+                    self._probe_ticket = object()
+                    return self._probe_ticket
+            return None
+
+    def retry_after(self) -> int:
+        """
+        Seconds until the breaker will let a probe through (at least 1).
+        """
+        with self._lock:
+            remaining = self._opened_at + self.recovery_seconds - time.monotonic()
+        return max(1, int(remaining + 0.999))
+
+    def record_success(self, ticket, latency: float):
+        slow = latency >= self.slow_call_seconds
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                # Calls admitted before the breaker opened (or abandoned probes) don't count
+                if ticket is not self._probe_ticket:
+                    return
+                if slow:
+                    self._trip()
+                else:
+                    print(f"Circuit '{self.name}' closed")
+                    self._state = self.CLOSED
+                    self._outcomes.clear()
+                    self._probe_started_at = None
+                    self._probe_ticket = None
+                return
+            if self._state == self.OPEN or ticket is not self.REGULAR_CALL:
+                return
+            self._outcomes.append((False, slow))
+            self._evaluate()
+
+    def record_failure(self, ticket):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                if ticket is self._probe_ticket:
+                    self._trip()
+                return
+            if self._state == self.OPEN or ticket is not self.REGULAR_CALL:
+                return
+            self._outcomes.append((True, False))
+            self._evaluate()
+
+    def _refresh_state(self):
+        if (self._state == self.OPEN
+                and time.monotonic() - self._opened_at >= self.recovery_seconds):
+            self._state = self.HALF_OPEN
+            self._probe_started_at = None
+            self._probe_ticket = None
+
+    def _evaluate(self):
+        calls = len(self._outcomes)
+        if calls < self.min_calls:
+            return
+        failures = sum(1 for failed, _ in self._outcomes if failed)
+        slow_calls = sum(1 for _, slow in self._outcomes if slow)
+        if (failures / calls >= self.failure_rate
+                or slow_calls / calls >= self.slow_call_rate):
+            self._trip()
+
+    def _trip(self):
+        print(f"Circuit '{self.name}' opened for {self.recovery_seconds}s")
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._probe_started_at = None
+        self._probe_ticket = None
+        self._outcomes.clear()
+
+
+class StaleWhileRevalidateCache:
+    """
+    Bounded LRU cache of parsed endpoint results that remembers when each entry was stored,
+    so callers can serve stale entries while refreshing them in the background.
+    """
+
+    def __init__(self, fresh_seconds=LEXICAL_CACHE_FRESH_SECONDS, max_entries=LEXICAL_CACHE_MAX_ENTRIES):
+        self.fresh_seconds = fresh_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (stored_at, fresh_seconds, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Returns (value, is_fresh) for a cached key, or None if the key is unknown.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            stored_at, fresh_seconds, value = entry
+        return value, time.monotonic() - stored_at < fresh_seconds
+
+    def set(self, key, value, age=0.0, fresh_seconds=None):
+        """
+        Stores a value; `age` backdates entries that were already this many seconds old.
+        `fresh_seconds` gives the entry its own freshness window; by default a replaced
+        entry keeps its window and a new one gets the cache's.
+        """
+        with self._lock:
+            if fresh_seconds is None:
+                previous = self._entries.get(key)
+                fresh_seconds = previous[1] if previous is not None else self.fresh_seconds
+            self._entries[key] = (time.monotonic() - age, fresh_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class AdmissionController:
+    """
+    Bounds the number of requests of one endpoint class that run concurrently and
+    the number allowed to wait for a slot. Waiting requests give up after `queue_timeout`.
+    """
+
+    def __init__(self, name: str, max_in_flight: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._waiting = 0
+
+    async def acquire(self) -> bool:
+        """
+        Waits for a slot. Returns False if the queue is full or the queue deadline passed.
+        """
+        if self._semaphore.locked():
+            if self._waiting >= self.max_queue:
+                return False
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._waiting -= 1
+
+    def release(self):
+        self._semaphore.release()
+
+
+class RateLimiter:
+    """
+    Token bucket per client key, refilled at `rate_per_minute` up to `burst` tokens.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int, max_clients=RATE_LIMIT_MAX_CLIENTS):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at)
+
+    def check(self, key: str) -> float:
+        """
+        Takes a token for the key. Returns 0 if allowed, otherwise seconds until a token is available.
+        """
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(key, (float(self.burst), now))
+        tokens = min(self.burst, tokens + (now - updated_at) * self.rate_per_second)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / self.rate_per_second
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+class HedgePolicy:
+    """
+    Latency history, hedging budget and hedge metrics for one endpoint.
+    """
+
+    def __init__(self, name: str, percentile=HEDGE_PERCENTILE, budget=HEDGE_BUDGET,
+                 min_samples=HEDGE_MIN_SAMPLES, window=HEDGE_WINDOW):
+        self.name = name
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self._latencies = deque(maxlen=window)
+        self._recent_hedges = deque(maxlen=window)  # whether each recent call was hedged
+        self._in_flight_hedges = 0
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+
+    def _latency_percentile(self, percentile):
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percentile / 100))]
+
+    def hedge_delay(self) -> Optional[float]:
+        """
+        Seconds to wait before hedging, or None if hedging is off or there is too little history.
+        """
+        with self._lock:
+            if not HEDGING_ENABLED or len(self._latencies) < self.min_samples:
+                return None
+            return self._latency_percentile(self.percentile)
+
+    def try_hedge(self) -> bool:
+        """
+        Takes a hedge from the budget, if the share of recent calls that were hedged allows it.
+        Hedges still in flight count against the budget, so a latency spike can't hedge every call.
+        """
+        with self._lock:
+            hedges = sum(self._recent_hedges) + self._in_flight_hedges
+            if hedges + 1 > self.budget * (len(self._recent_hedges) + 1):
+                return False
+            self._in_flight_hedges += 1
+            self.hedges += 1
+            return True
+
+    def record(self, latency: float, hedged: bool, hedge_won: bool):
+        with self._lock:
+            self._finish(hedged)
+            self.hedge_wins += hedge_won
+            self._latencies.append(latency)
+
+    def record_failure(self, hedged: bool):
+        with self._lock:
+            self._finish(hedged)
+
+    def _finish(self, hedged: bool):
+        self.calls += 1
+        self._recent_hedges.append(hedged)
+        if hedged:
+            self._in_flight_hedges -= 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            has_latencies = bool(self._latencies)
+            return {
+                "calls": self.calls,
+                "hedges": self.hedges,
+                "hedgeWins": self.hedge_wins,
+                "hedgeRate": self.hedges / self.calls if self.calls else 0.0,
+                "winRate": self.hedge_wins / self.hedges if self.hedges else 0.0,
+                "p50": self._latency_percentile(50) if has_latencies else None,
+                "p99": self._latency_percentile(99) if has_latencies else None,
+            }
+
+
+chat_breaker = CircuitBreaker("chat")
+tts_breaker = CircuitBreaker("tts")
+lexical_cache = StaleWhileRevalidateCache()
+lexicon_store = LexiconStore(LEXICON_DB_PATH)
+
+llm_admission = AdmissionController(
+    "llm", ADMISSION_LLM_MAX_IN_FLIGHT, ADMISSION_LLM_MAX_QUEUE, ADMISSION_LLM_QUEUE_TIMEOUT_SECONDS)
+tts_admission = AdmissionController(
+    "tts", ADMISSION_TTS_MAX_IN_FLIGHT, ADMISSION_TTS_MAX_QUEUE, ADMISSION_TTS_QUEUE_TIMEOUT_SECONDS)
+rate_limiter = RateLimiter(RATE_LIMIT_PER_MINUTE, RATE_LIMIT_BURST) if RATE_LIMIT_PER_MINUTE > 0 else None
+
+# Hedge policies per endpoint type ("tts" for speech), created on first use
+hedge_policies = {}
+_hedge_policies_lock = threading.Lock()
+_hedge_executor = ThreadPoolExecutor(max_workers=HEDGE_TTS_WORKERS, thread_name_prefix="tts-hedge")
+# The lexicon has its own thread (its connection is serialized anyway), so /search at keystroke
+# rates never queues behind parse jobs blocked on TTS in the default executor
+_lexicon_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lexicon")
+_async_openai_client = None
+
+
+def get_hedge_policy(name: str) -> HedgePolicy:
+    with _hedge_policies_lock:
+        if name not in hedge_policies:
+            hedge_policies[name] = HedgePolicy(name)
+        return hedge_policies[name]
+
+
+def get_async_openai_client() -> AsyncOpenAI:
+    """
+    Lazily creates the shared async client, so a missing key only fails the calls that need it.
+    SDK retries are off: a timed-out call would otherwise block for several timeouts before the
+    breaker sees one failure. The breaker and hedging decide when to try again.
+    """
+    global _async_openai_client
+    if _async_openai_client is None:
+        _async_openai_client = AsyncOpenAI(api_key=os.environ.get('OPENAI_API_KEY'), max_retries=0)
+    return _async_openai_client
+
+
+async def run_in_lexicon(func, *args):
+    """
+    Runs a blocking LexiconStore call on the lexicon thread.
+    """
+    return await asyncio.get_running_loop().run_in_executor(_lexicon_executor, func, *args)
+
+
+async def hedged_call(policy: HedgePolicy, breaker: CircuitBreaker, make_call):
+    """
+    Awaits make_call(), sending a second make_call() if the first is slower than the
+    policy's hedge delay. The first successful attempt wins and the other one is cancelled.
+    """
+    started = time.monotonic()
+    attempts = [asyncio.ensure_future(make_call())]
+    hedged = recorded = False
+    try:
+        delay = policy.hedge_delay()
+        if delay is not None:
+            done, _ = await asyncio.wait(attempts, timeout=delay)
+            # Never hedge against an upstream the breaker considers unhealthy
+            if not done and breaker.state == CircuitBreaker.CLOSED and policy.try_hedge():
+                hedged = True
+                attempts.append(asyncio.ensure_future(make_call()))
+
+        pending = set(attempts)
+        while True:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            winner = next((task for task in attempts if task in done and task.exception() is None), None)
+            if winner is not None:
+                policy.record(time.monotonic() - started, hedged, winner is not attempts[0])
+                recorded = True
+                return winner.result()
+            if not pending:
+                # Every attempt failed; surface the first attempt's error
+                raise attempts[0].exception()
+    finally:
+        if not recorded:
+            policy.record_failure(hedged)
+        for task in attempts:
+            task.cancel()
+
+
+def hedged_call_sync(policy: HedgePolicy, breaker: CircuitBreaker, start_attempt):
+    """
+    Blocking counterpart of `hedged_call` for code running in worker threads.
+
+    start_attempt() returns (future, cancel) where cancel aborts the attempt's request.
+    """
+    started = time.monotonic()
+    attempts = [start_attempt()]
+    hedged = recorded = False
+    try:
+        delay = policy.hedge_delay()
+        if delay is not None:
+            done, _ = wait_futures([attempts[0][0]], timeout=delay)
+            if not done and breaker.state == CircuitBreaker.CLOSED and policy.try_hedge():
+                hedged = True
+                attempts.append(start_attempt())
+
+        futures = [future for future, _ in attempts]
+        pending = set(futures)
+        while True:
+            done, pending = wait_futures(pending, return_when=FIRST_COMPLETED)
+            winner = next((future for future in futures if future in done and future.exception() is None), None)
+            if winner is not None:
+                policy.record(time.monotonic() - started, hedged, winner is not futures[0])
+                recorded = True
+                return winner.result()
+            if not pending:
+                raise futures[0].exception()
+    finally:
+        if not recorded:
+            policy.record_failure(hedged)
+        for future, cancel in attempts:
+            if not future.done():
+                future.cancel()
+                cancel()
+
+
+# Keys currently being refreshed in the background, and the tasks doing it
+_refreshing_keys = set()
+_background_tasks = set()
+# Locally computed results already in the lexicon, so repeat requests skip the lexicon thread
+_indexed_local_keys = OrderedDict()
+
 
 def generate_safe_file_name(word: str, extension="mp3"):
     """
@@ -39,7 +518,6 @@ def generate_safe_file_name(word: str, extension="mp3"):
 
 def generate_audio_for_form(form: str) -> Optional[str]:
     try:
-        client = OpenAI(api_key=os.environ.get('OPENAI_API_KEY'))
         # Log the form being processed
         print(f"Generating audio for form: {form}")
 
@@ -63,12 +541,33 @@ def generate_audio_for_form(form: str) -> Optional[str]:
         audio_url = f"{BASE_URL}/files/{file_name}" # an accessible path to the voice file
 
 
+        # Fail fast while the TTS upstream is unhealthy
+        ticket = tts_breaker.allow_request()
+        if ticket is None:
+            print(f"TTS circuit open, skipping audio for {form}")
+            return "null"
+
+        def start_attempt():
+            # Each attempt gets its own client so a losing hedge can be aborted by closing it
+            # No SDK retries, like the chat client: one attempt is bounded by UPSTREAM_TIMEOUT_SECONDS
+            attempt_client = OpenAI(api_key=os.environ.get('OPENAI_API_KEY'), max_retries=0)
+            future = _hedge_executor.submit(
+                attempt_client.audio.speech.create,
+                model="tts-1",
+                voice="alloy",
+                input=form,
+                timeout=UPSTREAM_TIMEOUT_SECONDS
+            )
+            return future, attempt_client.close
+
         # Replace this with your TTS client call
-        response = client.audio.speech.create(
-            model="tts-1",
-            voice="alloy",
-            input=form
-        )
+        started = time.monotonic()
+        try:
+            response = hedged_call_sync(get_hedge_policy("tts"), tts_breaker, start_attempt)
+        except Exception:
+            tts_breaker.record_failure(ticket)
+            raise
+        tts_breaker.record_success(ticket, time.monotonic() - started)
 
         # Save the MP3 file to the specified path
         with open(speech_file_path, "wb") as f:
@@ -402,21 +901,221 @@ def parse_response_to_json(response_text, endpoint_type):
 
 
 
-async def generate_response_from_gpt(prompt):
+async def generate_response_from_gpt(prompt, endpoint_type="chat"):
     """
     Sends a prompt to GPT-4o and returns the response text.
+    Fails fast with a 503 while the chat circuit breaker is open, and hedges slow calls
+    against the latency history of `endpoint_type` when hedging is enabled.
     """
+    ticket = chat_breaker.allow_request()
+    if ticket is None:
+        raise HTTPException(
+            status_code=503, detail="GPT-4 is temporarily unavailable, please retry later.",
+            headers={"Retry-After": str(chat_breaker.retry_after())})
+
+    started = time.monotonic()
     try:
-        response = openai.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=4000,
-            temperature=0,
-        )
-        return response.choices[0].message.content.strip()
+        response = await hedged_call(
+            get_hedge_policy(endpoint_type), chat_breaker,
+            lambda: get_async_openai_client().chat.completions.create(
+                model="gpt-4o",
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=4000,
+                temperature=0,
+                timeout=UPSTREAM_TIMEOUT_SECONDS,
+            ))
     except Exception as e:
+        chat_breaker.record_failure(ticket)
         raise HTTPException(
             status_code=500, detail=f"Error with GPT-4: {str(e)}")
+    chat_breaker.record_success(ticket, time.monotonic() - started)
+    return response.choices[0].message.content.strip()
+
+
+async def fetch_and_parse(prompt, endpoint_type):
+    """
+    Requests a GPT response for the prompt and parses it off the event loop
+    (parsing may generate audio files). Phonetics of vocalized forms are transcribed locally.
+    """
+    result = await generate_response_from_gpt(prompt, endpoint_type)
+    parsed_response = await asyncio.to_thread(parse_response_to_json, result, endpoint_type)
+    return fill_phonetic_fields(parsed_response)
+
+
+async def remember_result(word, endpoint_type, parsed_response, replace=True):
+    """
+    Keeps a parsed result in the lexical cache and the persistent lexicon.
+    """
+    lexical_cache.set((endpoint_type, word), parsed_response)
+    try:
+        await run_in_lexicon(lexicon_store.save, word, endpoint_type, parsed_response, replace)
+    except Exception as e:
+        print(f"Error saving {endpoint_type} for {word} to the lexicon: {e}")
+
+
+async def index_local_result(word, endpoint_type, parsed_response):
+    """
+    Adds a locally computed result to the persistent lexicon once, so it can be searched.
+    It skips the lexical cache: the local computation always runs before the cache is read.
+    """
+    key = (endpoint_type, word)
+    if key in _indexed_local_keys:
+        _indexed_local_keys.move_to_end(key)
+        return
+    _indexed_local_keys[key] = True
+    while len(_indexed_local_keys) > LEXICAL_CACHE_MAX_ENTRIES:
+        _indexed_local_keys.popitem(last=False)
+    try:
+        await run_in_lexicon(lexicon_store.save, word, endpoint_type, parsed_response, False)
+    except Exception as e:
+        _indexed_local_keys.pop(key, None)
+        print(f"Error saving {endpoint_type} for {word} to the lexicon: {e}")
+
+
+def _has_content(value) -> bool:
+    """
+    True if a parsed result holds any text besides "null" placeholders ({"stems": []} doesn't).
+    """
+    if isinstance(value, dict):
+        return any(_has_content(item) for item in value.values())
+    if isinstance(value, list):
+        return any(_has_content(item) for item in value)
+    return isinstance(value, str) and bool(value.strip()) and value != "null"
+
+
+def _audio_urls(value, urls):
+    """
+    Collects form -> audio URL for every entry of a parsed result whose audio was generated.
+    """
+    if isinstance(value, dict):
+        if isinstance(value.get("form"), str) and value.get("audio") not in (None, "null"):
+            urls[value["form"]] = value["audio"]
+        for item in value.values():
+            _audio_urls(item, urls)
+    elif isinstance(value, list):
+        for item in value:
+            _audio_urls(item, urls)
+    return urls
+
+
+def _restore_audio(value, urls):
+    """
+    Puts known audio URLs back into entries whose audio fell back to "null". Updates in place.
+    """
+    if isinstance(value, dict):
+        if value.get("audio") == "null" and value.get("form") in urls:
+            value["audio"] = urls[value["form"]]
+        for item in value.values():
+            _restore_audio(item, urls)
+    elif isinstance(value, list):
+        for item in value:
+            _restore_audio(item, urls)
+    return value
+
+
+async def _refresh_lexical_entry(key, prompt, endpoint_type):
+    try:
+        endpoint_type, word = key
+        cached = lexical_cache.get(key)
+        refreshed = await fetch_and_parse(prompt, endpoint_type)
+        if cached is not None:
+            previous = cached[0]
+            if not _has_content(refreshed):
+                # Never trade the last good result for an empty one; keeping it also
+                # restarts its freshness window so the next read doesn't pay for another refresh
+                await remember_result(word, endpoint_type, previous, replace=False)
+                return
+            # Audio that couldn't be generated this time (TTS circuit open) keeps its old file
+            _restore_audio(refreshed, _audio_urls(previous, {}))
+        await remember_result(word, endpoint_type, refreshed)
+    except Exception as e:
+        print(f"Background refresh failed for {key}: {e}")
+    finally:
+        _refreshing_keys.discard(key)
+
+
+async def get_lexical_result(word, prompt, endpoint_type):
+    """
+    Serves a lexical endpoint result with stale-while-revalidate semantics.
+
+    A cached result is returned immediately. It is refreshed in the background when it is
+    past its freshness window or when the chat circuit is half-open and needs a probe.
+    The persistent lexicon backs the in-memory cache; only a miss in both waits on the upstream.
+    """
+    key = (endpoint_type, word)
+    cached = lexical_cache.get(key)
+    if cached is None:
+        stored = await run_in_lexicon(lexicon_store.get, word, endpoint_type)
+        if stored is None:
+            parsed_response = await fetch_and_parse(prompt, endpoint_type)
+            await remember_result(word, endpoint_type, parsed_response)
+            return parsed_response
+        value, age = stored
+        # Stored entries keep their real age but get the lexicon's much longer freshness window,
+        # so a persisted word isn't bought again from GPT and TTS every hour
+        lexical_cache.set(key, value, age=age, fresh_seconds=LEXICON_FRESH_SECONDS)
+        cached = lexical_cache.get(key)
+
+    value, is_fresh = cached
+    state = chat_breaker.state
+    needs_refresh = (not is_fresh and state != CircuitBreaker.OPEN) or state == CircuitBreaker.HALF_OPEN
+    if needs_refresh and key not in _refreshing_keys:
+        _refreshing_keys.add(key)
+        task = asyncio.create_task(_refresh_lexical_entry(key, prompt, endpoint_type))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+    return value
+
+
+def get_client_key(request: Request) -> str:
+    """
+    Identifies the caller for rate limiting: a known API key if given, else the client IP.
+    """
+    # Only configured keys count, otherwise rotating random keys would get a fresh bucket each time
+    api_key = request.headers.get("x-api-key")
+    if api_key and api_key in RATE_LIMIT_API_KEYS:
+        return f"key:{api_key}"
+    # The client controls everything in X-Forwarded-For except the right-most address,
+    # which our trusted proxy appends
+    forwarded = request.headers.get("x-forwarded-for") if TRUST_PROXY_HEADERS else None
+    if forwarded and forwarded.split(",")[-1].strip():
+        return f"ip:{forwarded.split(',')[-1].strip()}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+def overloaded_response(detail: str, status_code=503, retry_after=ADMISSION_RETRY_AFTER_SECONDS):
+    return JSONResponse(
+        status_code=status_code, content={"detail": detail},
+        headers={"Retry-After": str(max(1, int(retry_after + 0.999)))})
+
+
+@app.middleware("http")
+async def admission_control(request: Request, call_next):
+    """
+    Rate limits and admits requests to the get* routes, shedding load with a fast 503
+    instead of letting requests pile up behind the upstream.
+    """
+    path = request.url.path
+    if not path.startswith("/get"):
+        return await call_next(request)
+    controller = tts_admission if path.startswith("/getAudio") else llm_admission
+
+    if rate_limiter is not None:
+        wait = rate_limiter.check(get_client_key(request))
+        if wait > 0:
+            return overloaded_response("Rate limit exceeded.", status_code=429, retry_after=wait)
+
+    if not await controller.acquire():
+        print(f"Shedding {path}: '{controller.name}' endpoints are saturated")
+        return overloaded_response("Server is busy, please retry later.")
+    try:
+        # Don't spend an upstream call on a client that gave up while queued
+        if await request.is_disconnected():
+            print(f"Dropping {path}: client disconnected while queued")
+            return overloaded_response("Client disconnected.")
+        return await call_next(request)
+    finally:
+        controller.release()
 
 
 @ app.get("/", response_class=HTMLResponse)
@@ -464,7 +1163,7 @@ async def get_audio(word: str):
                 status_code=400, detail="Please provide a valid word.")
 
         # Generate audio and retrieve the URL
-        audio_url = generate_audio_for_form(word)
+        audio_url = await asyncio.to_thread(generate_audio_for_form, word)
 
         # Return the audio URL
         return {"audio_url": audio_url}
@@ -474,14 +1173,11 @@ async def get_audio(word: str):
             status_code=500, detail=f"Error generating audio for {word}: {str(e)}")
 
 
-@ app.get("/getWordForms")
-async def get_word_forms_api(word: str):
+def word_forms_prompt(word: str) -> str:
     """
-    Endpoint to generate word forms for the given Arabic word.
+    Builds the GPT prompt that enumerates the word forms of the given Arabic word.
     """
-    if not word:
-        raise HTTPException(status_code=400, detail="Please provide a word.")
-    prompt = f"""
+    return f"""
         Please generate all word forms for the Arabic word: {word}.
         The response should include variations based on the following criteria:
         - Tense: Past (P), Present (S), or Future (F).
@@ -499,11 +1195,25 @@ async def get_word_forms_api(word: str):
         - يَضْحَك: S, m, 1, 3, a
         """
 
-    # Request GPT response
-    result = await generate_response_from_gpt(prompt)
 
-    # Parse the OpenAI response
-    parsed_response = parse_response_to_json(result, "wordForms")
+@ app.get("/getWordForms")
+async def get_word_forms_api(word: str):
+    """
+    Endpoint to generate word forms for the given Arabic word.
+    Regular and common weak Form I verbs are conjugated locally; other words go to GPT.
+    """
+    if not word:
+        raise HTTPException(status_code=400, detail="Please provide a word.")
+
+    # Conjugate locally when the morphology engine knows the verb
+    word_forms = conjugate_verb(word)
+    if word_forms is not None:
+        parsed_response = {"wordForms": word_forms}
+        await index_local_result(word, "wordForms", parsed_response)
+        return parsed_response
+
+    # Serve from the lexical cache, requesting GPT only on a miss
+    parsed_response = await get_lexical_result(word, word_forms_prompt(word), "wordForms")
 
 
     # Return the parsed response
@@ -523,10 +1233,8 @@ async def get_dialect_api(word: str):
         Give me a very short and simple answer in Arabic. 
         make sure if the word is MSA print "فُصحى" but if there is no other choice classify it from the main seven Arab dialects choose it from them and do not only print "عامية"
         Make sure The response should be in one word like: (answer) """
-    result = await generate_response_from_gpt(prompt)
-
-    # Parse the OpenAI response
-    parsed_response = parse_response_to_json(result, "dialect")
+    # Serve from the lexical cache, requesting GPT only on a miss
+    parsed_response = await get_lexical_result(word, prompt, "dialect")
 
 
     # Return the parsed response
@@ -537,20 +1245,25 @@ async def get_dialect_api(word: str):
 async def get_phonetic_api(word: str):
     """
     Endpoint to get the phonetic representation of the given Arabic word. start with verbs and if the word not a verb return the noun
+    Fully vocalized words are transcribed locally.
     """
     if not word:
         raise HTTPException(status_code=400, detail="Please provide a word.")
 
+    # Vocalized input is transcribed locally, no GPT round trip needed
+    if is_vocalized(word):
+        parsed_response = {"phonetic": transcribe(word)}
+        await index_local_result(word, "phonetic", parsed_response)
+        return parsed_response
+
     prompt = f"""
         Provide the phonetic representation of the Arabic word '{word}'.
         If the word is a verb, return the verb's phonetic.
         If the word is not a verb, return the noun's phonetic.
         Give only the phonetic representation and nothing else.
         """
-    result = await generate_response_from_gpt(prompt)
-
-    # Parse the OpenAI response
-    parsed_response = parse_response_to_json(result, "phonetic")
+    # Serve from the lexical cache, requesting GPT only on a miss
+    parsed_response = await get_lexical_result(word, prompt, "phonetic")
 
 
     # Return the parsed response
@@ -583,11 +1296,8 @@ async def get_stems(word: str):
 
         """
 
-    # Request GPT response
-    result = await generate_response_from_gpt(prompt)
-
-    # Parse the OpenAI response
-    parsed_response = parse_response_to_json(result, "stems")
+    # Serve from the lexical cache, requesting GPT only on a miss
+    parsed_response = await get_lexical_result(word, prompt, "stems")
 
     # Return the parsed response
     return parsed_response
@@ -627,11 +1337,8 @@ async def get_definition(word: str):
         - TextRepresentation: الضَّريبةُ تُستخدم لتمويل الخدمات العامة والمشاريع الحكومية بشكل كامل، Standard Arabic, null, null
         """
 
-    # Request GPT response
-    result = await generate_response_from_gpt(prompt)
-
-    # Parse the OpenAI response
-    parsed_response = parse_response_to_json(result, "definition")
+    # Serve from the lexical cache, requesting GPT only on a miss
+    parsed_response = await get_lexical_result(word, prompt, "definition")
 
 
     # Return the parsed response
@@ -665,11 +1372,8 @@ async def get_sense_translation(word: str):
     - fr: Qui touche un point sensible, ki tuʃ œ̃ pwɛ̃ sɑ̃sibl, French, https://example.com/audio_fr.mp3
     """
 
-    # Request GPT response
-    result = await generate_response_from_gpt(prompt)
-
-    # Parse the OpenAI response
-    parsed_response = parse_response_to_json(result, "translations")
+    # Serve from the lexical cache, requesting GPT only on a miss
+    parsed_response = await get_lexical_result(word, prompt, "translations")
 
 
     # Return the parsed response
@@ -706,11 +1410,8 @@ async def get_examples(word: str):
     - وَإِذا ضُرِبَ بِالمِعْوَلِ فِي الأرض...: wa ʔiða ḍuriba bil-miʿwal fiː al-ʔardˤ..., Quranic Arabic, https://example.com/audio3.mp3, quranic, true, القرآن الكريم
     """
 
-    # Request GPT response
-    result = await generate_response_from_gpt(prompt)
-
-    # Parse the OpenAI response
-    parsed_response = parse_response_to_json(result, "examples")
+    # Serve from the lexical cache, requesting GPT only on a miss
+    parsed_response = await get_lexical_result(word, prompt, "examples")
 
 
     # Return the parsed response
@@ -745,11 +1446,8 @@ async def get_contexts(word: str):
     - الكلمة تُشير إلى نوع من الهجوم بالسيف.: al-kalimatu tuʃiːru ʔilaː nauʕ min al-hujum bi-s-sayf, Standard Arabic, https://example.com/audio_sword.mp3, 2, 1002, true
     """
 
-    # Request GPT response
-    result = await generate_response_from_gpt(prompt)
-
-    # Parse the OpenAI response
-    parsed_response = parse_response_to_json(result, "contexts")
+    # Serve from the lexical cache, requesting GPT only on a miss
+    parsed_response = await get_lexical_result(word, prompt, "contexts")
 
 
     # Return the parsed response
@@ -759,6 +1457,45 @@ async def get_contexts(word: str):
 
 
 
+@app.get("/search")
+async def search_lexicon(q: str, limit: int = 10, mode: str = "prefix"):
+    """
+    Answers from the persistent lexicon without calling GPT.
+    mode=prefix autocompletes words and word forms, mode=text searches the stored results.
+    """
+    if not q:
+        raise HTTPException(status_code=400, detail="Please provide a query.")
+    if mode not in ("prefix", "text"):
+        raise HTTPException(status_code=400, detail="mode must be 'prefix' or 'text'.")
+    limit = max(1, min(limit, 50))
+
+    # SQLite calls run on the lexicon thread, like every other lexicon access
+    if mode == "prefix":
+        results = await run_in_lexicon(lexicon_store.autocomplete, q, limit)
+    else:
+        results = await run_in_lexicon(lexicon_store.search, q, limit)
+    return {"query": q, "results": results}
+
+
+
+
+
+@app.get("/metrics/hedging")
+async def get_hedging_metrics():
+    """
+    Hedge rate, hedge win rate and recent latency percentiles per endpoint.
+    """
+    with _hedge_policies_lock:
+        policies = list(hedge_policies.values())
+    return {
+        "enabled": HEDGING_ENABLED,
+        "endpoints": {policy.name: policy.snapshot() for policy in policies},
+    }
+
+
+
+
+
 ############ Need to get the file from render ########
 
 
@@ -0,0 +1,418 @@
+"""
+Rule-based conjugation of Form I Arabic verbs.
+
+Generates the same `formRepresentations` entries that `parse_response_to_json`
+builds from the GPT word-forms response, for sound, doubled, assimilated,
+hollow and defective triliteral verbs. Anything else (hamzated or doubly weak
+roots, derived forms, unknown vowel classes) is left to the LLM.
+"""
+from typing import List, Optional
+
+FATHA = "َ"
+DAMMA = "ُ"
+KASRA = "ِ"
+SUKUN = "ْ"
+SHADDA = "ّ"
+
+VOWELS = {"a": FATHA, "u": DAMMA, "i": KASRA}
+DIACRITICS = set("ًٌٍَُِّْٰـ")
+HAMZAS = set("ءأإؤئآ")
+FUTURE_PREFIX = "س" + FATHA
+
+# (person, gender, number, past ending, present prefix, present ending)
+# First person has common gender, so it is listed for both m and f; its dual is the plural form.
+SLOTS = [
+    ("3", "m", "1", "a", "ي", "u"),
+    ("3", "f", "1", "at", "ت", "u"),
+    ("3", "m", "2", "aa", "ي", "aani"),
+    ("3", "f", "2", "ataa", "ت", "aani"),
+    ("3", "m", "3", "uu", "ي", "uuna"),
+    ("3", "f", "3", "na", "ي", "na"),
+    ("2", "m", "1", "ta", "ت", "u"),
+    ("2", "f", "1", "ti", "ت", "iina"),
+    ("2", "m", "2", "tumaa", "ت", "aani"),
+    ("2", "f", "2", "tumaa", "ت", "aani"),
+    ("2", "m", "3", "tum", "ت", "uuna"),
+    ("2", "f", "3", "tunna", "ت", "na"),
+    ("1", "m", "1", "tu", "أ", "u"),
+    ("1", "f", "1", "tu", "أ", "u"),
+    ("1", "m", "3", "naa", "ن", "u"),
+    ("1", "f", "3", "naa", "ن", "u"),
+]
+
+# Ending -> (vowel on the last radical, letters that follow it)
+PAST_ENDINGS = {
+    "a": (FATHA, ""),
+    "at": (FATHA, "ت" + SUKUN),
+    "aa": (FATHA, "ا"),
+    "ataa": (FATHA, "ت" + FATHA + "ا"),
+    "uu": (DAMMA, "وا"),
+    "na": (SUKUN, "ن" + FATHA),
+    "ta": (SUKUN, "ت" + FATHA),
+    "ti": (SUKUN, "ت" + KASRA),
+    "tumaa": (SUKUN, "ت" + DAMMA + "م" + FATHA + "ا"),
+    "tum": (SUKUN, "ت" + DAMMA + "م" + SUKUN),
+    "tunna": (SUKUN, "ت" + DAMMA + "ن" + SHADDA + FATHA),
+    "tu": (SUKUN, "ت" + DAMMA),
+    "naa": (SUKUN, "ن" + FATHA + "ا"),
+}
+PRESENT_ENDINGS = {
+    "u": (DAMMA, ""),
+    "aani": (FATHA, "ان" + KASRA),
+    "uuna": (DAMMA, "ون" + FATHA),
+    "iina": (KASRA, "ين" + FATHA),
+    "na": (SUKUN, "ن" + FATHA),
+}
+
+# Defective verbs: past ending -> stem tail after the second radical
+DEFECTIVE_PAST_I = {  # نَسِيَ and every past passive (دُعِيَ)
+    "a": KASRA + "ي" + FATHA,
+    "at": KASRA + "ي" + FATHA + "ت" + SUKUN,
+    "aa": KASRA + "ي" + FATHA + "ا",
+    "ataa": KASRA + "ي" + FATHA + "ت" + FATHA + "ا",
+    "uu": DAMMA + "وا",
+}
+# Defective verbs: present ending -> stem tail after the second radical, per present vowel
+DEFECTIVE_PRESENT = {
+    "u": {"u": DAMMA + "و", "aani": DAMMA + "و" + FATHA + "ان" + KASRA, "uuna": DAMMA + "ون" + FATHA,
+          "iina": KASRA + "ين" + FATHA, "na": DAMMA + "ون" + FATHA},
+    "i": {"u": KASRA + "ي", "aani": KASRA + "ي" + FATHA + "ان" + KASRA, "uuna": DAMMA + "ون" + FATHA,
+          "iina": KASRA + "ين" + FATHA, "na": KASRA + "ين" + FATHA},
+    "a": {"u": FATHA + "ى", "aani": FATHA + "ي" + FATHA + "ان" + KASRA, "uuna": FATHA + "و" + SUKUN + "ن" + FATHA,
+          "iina": FATHA + "ي" + SUKUN + "ن" + FATHA, "na": FATHA + "ي" + SUKUN + "ن" + FATHA},
+}
+
+# Common verbs whose vowel class can't be read off the unvocalized past form:
+# bare past -> (root, past vowel, present vowel)
+COMMON_VERBS = {
+    # sound, yafʿulu
+    "كتب": ("كتب", "a", "u"), "نصر": ("نصر", "a", "u"), "قتل": ("قتل", "a", "u"),
+    "خرج": ("خرج", "a", "u"), "دخل": ("دخل", "a", "u"), "سكن": ("سكن", "a", "u"),
+    "شكر": ("شكر", "a", "u"), "طلب": ("طلب", "a", "u"), "ترك": ("ترك", "a", "u"),
+    "حضر": ("حضر", "a", "u"), "نظر": ("نظر", "a", "u"), "رقص": ("رقص", "a", "u"),
+    "سجد": ("سجد", "a", "u"), "قعد": ("قعد", "a", "u"), "طبخ": ("طبخ", "a", "u"),
+    "رسم": ("رسم", "a", "u"), "حكم": ("حكم", "a", "u"), "عبد": ("عبد", "a", "u"),
+    "درس": ("درس", "a", "u"), "سكت": ("سكت", "a", "u"), "صرخ": ("صرخ", "a", "u"),
+    "ركض": ("ركض", "a", "u"), "حصل": ("حصل", "a", "u"), "بلغ": ("بلغ", "a", "u"),
+    "نقل": ("نقل", "a", "u"), "شعر": ("شعر", "a", "u"),
+    # sound, yafʿilu
+    "ضرب": ("ضرب", "a", "i"), "جلس": ("جلس", "a", "i"), "غسل": ("غسل", "a", "i"),
+    "حمل": ("حمل", "a", "i"), "نزل": ("نزل", "a", "i"), "رجع": ("رجع", "a", "i"),
+    "عرف": ("عرف", "a", "i"), "كسر": ("كسر", "a", "i"), "صبر": ("صبر", "a", "i"),
+    "سرق": ("سرق", "a", "i"), "حبس": ("حبس", "a", "i"), "غفر": ("غفر", "a", "i"),
+    "قدر": ("قدر", "a", "i"), "عرض": ("عرض", "a", "i"),
+    # sound, yafʿalu
+    "فتح": ("فتح", "a", "a"), "ذهب": ("ذهب", "a", "a"), "منع": ("منع", "a", "a"),
+    "جمع": ("جمع", "a", "a"), "نفع": ("نفع", "a", "a"), "سمح": ("سمح", "a", "a"),
+    "ذبح": ("ذبح", "a", "a"), "نجح": ("نجح", "a", "a"), "زرع": ("زرع", "a", "a"),
+    "صنع": ("صنع", "a", "a"), "دفع": ("دفع", "a", "a"), "رفع": ("رفع", "a", "a"),
+    "بحث": ("بحث", "a", "a"), "سبح": ("سبح", "a", "a"), "شرح": ("شرح", "a", "a"),
+    # sound, faʿila / yafʿalu
+    "شرب": ("شرب", "i", "a"), "فهم": ("فهم", "i", "a"), "عمل": ("عمل", "i", "a"),
+    "علم": ("علم", "i", "a"), "لعب": ("لعب", "i", "a"), "سمع": ("سمع", "i", "a"),
+    "فرح": ("فرح", "i", "a"), "حزن": ("حزن", "i", "a"), "ركب": ("ركب", "i", "a"),
+    "لبس": ("لبس", "i", "a"), "ضحك": ("ضحك", "i", "a"), "حفظ": ("حفظ", "i", "a"),
+    "كره": ("كره", "i", "a"), "ندم": ("ندم", "i", "a"), "قبل": ("قبل", "i", "a"),
+    "صعد": ("صعد", "i", "a"), "خسر": ("خسر", "i", "a"), "تعب": ("تعب", "i", "a"),
+    "مرض": ("مرض", "i", "a"), "عطش": ("عطش", "i", "a"), "سلم": ("سلم", "i", "a"),
+    # sound, faʿula / yafʿulu
+    "كرم": ("كرم", "u", "u"), "كبر": ("كبر", "u", "u"), "صغر": ("صغر", "u", "u"),
+    "حسن": ("حسن", "u", "u"), "بعد": ("بعد", "u", "u"), "قرب": ("قرب", "u", "u"),
+    "صعب": ("صعب", "u", "u"), "سهل": ("سهل", "u", "u"), "كثر": ("كثر", "u", "u"),
+    "شرف": ("شرف", "u", "u"),
+    # doubled
+    "مد": ("مدد", "a", "u"), "رد": ("ردد", "a", "u"), "شد": ("شدد", "a", "u"),
+    "عد": ("عدد", "a", "u"), "ظن": ("ظنن", "a", "u"), "دل": ("دلل", "a", "u"),
+    "شك": ("شكك", "a", "u"), "حل": ("حلل", "a", "u"), "مر": ("مرر", "a", "u"),
+    "ضم": ("ضمم", "a", "u"), "هز": ("هزز", "a", "u"), "فر": ("فرر", "a", "i"),
+    "قل": ("قلل", "a", "i"), "تم": ("تمم", "a", "i"),
+    # assimilated
+    "وعد": ("وعد", "a", "i"), "وصل": ("وصل", "a", "i"), "وجد": ("وجد", "a", "i"),
+    "وقف": ("وقف", "a", "i"), "ولد": ("ولد", "a", "i"), "وزن": ("وزن", "a", "i"),
+    "وصف": ("وصف", "a", "i"), "وقع": ("وقع", "a", "a"), "وضع": ("وضع", "a", "a"),
+    "وهب": ("وهب", "a", "a"),
+    # hollow
+    "قال": ("قول", "a", "u"), "كان": ("كون", "a", "u"), "زار": ("زور", "a", "u"),
+    "قام": ("قوم", "a", "u"), "عاد": ("عود", "a", "u"), "صام": ("صوم", "a", "u"),
+    "مات": ("موت", "a", "u"), "ذاق": ("ذوق", "a", "u"), "لام": ("لوم", "a", "u"),
+    "فاز": ("فوز", "a", "u"), "قاد": ("قود", "a", "u"), "طاف": ("طوف", "a", "u"),
+    "دار": ("دور", "a", "u"), "باع": ("بيع", "a", "i"), "طار": ("طير", "a", "i"),
+    "سار": ("سير", "a", "i"), "عاش": ("عيش", "a", "i"), "غاب": ("غيب", "a", "i"),
+    "زاد": ("زيد", "a", "i"), "صار": ("صير", "a", "i"), "مال": ("ميل", "a", "i"),
+    "نام": ("نوم", "i", "a"), "خاف": ("خوف", "i", "a"), "نال": ("نيل", "i", "a"),
+    # defective
+    "دعا": ("دعو", "a", "u"), "رجا": ("رجو", "a", "u"), "نجا": ("نجو", "a", "u"),
+    "شكا": ("شكو", "a", "u"), "دنا": ("دنو", "a", "u"), "علا": ("علو", "a", "u"),
+    "بدا": ("بدو", "a", "u"), "عفا": ("عفو", "a", "u"), "غزا": ("غزو", "a", "u"),
+    "تلا": ("تلو", "a", "u"), "رمى": ("رمي", "a", "i"), "مشى": ("مشي", "a", "i"),
+    "جرى": ("جري", "a", "i"), "بنى": ("بني", "a", "i"), "بكى": ("بكي", "a", "i"),
+    "هدى": ("هدي", "a", "i"), "قضى": ("قضي", "a", "i"), "سقى": ("سقي", "a", "i"),
+    "كفى": ("كفي", "a", "i"), "حكى": ("حكي", "a", "i"), "شفى": ("شفي", "a", "i"),
+    "نسي": ("نسي", "i", "a"), "بقي": ("بقي", "i", "a"), "لقي": ("لقي", "i", "a"),
+    "رضي": ("رضي", "i", "a"), "خشي": ("خشي", "i", "a"),
+}
+
+# Particles and nouns that look like triliteral verbs (على، عصا، ملك، قبل...). They always go
+# to the LLM, except for homographs of COMMON_VERBS written with full past-verb vocalization.
+NON_VERBS = {
+    "على", "متى", "حتى", "هذا", "هنا", "لدى", "فتى", "عصا", "سوى", "بلى", "كلا", "لذا",
+    "ذلك", "هذه", "بين", "ثم", "قد", "لم", "لن", "من", "عن", "في", "ما", "لا", "كم",
+    "كيف", "اين", "ليس", "لكن", "مثل", "حيث", "عند", "كل", "بعض", "غير", "قبل", "بعد",
+    "ملك", "رجل", "كتف", "كبد", "نهر", "قمر", "بحر", "ولد", "علم", "عمل", "درس", "حكم",
+    "شعر", "حسن", "سهل", "صعب", "كتب", "جمع", "قلم", "باب", "دار", "مال", "نار",
+}
+
+
+def strip_diacritics(word: str) -> str:
+    return "".join(ch for ch in word if ch not in DIACRITICS)
+
+
+def _attach(radical: str, vowel: str, tail: str) -> str:
+    """
+    Puts the ending on the last radical, merging identical consonants into a shadda
+    (سَكَتْتُ -> سَكَتُّ, سَكَنْنَا -> سَكَنَّا).
+    """
+    if vowel == SUKUN and tail and tail[0] == radical:
+        return radical + SHADDA + tail[1:]
+    return radical + vowel + tail
+
+
+def _sound(c1, c2, c3, past_vowel, present_vowel):
+    def past(ending, passive):
+        vowel, tail = PAST_ENDINGS[ending]
+        if passive:
+            return c1 + DAMMA + c2 + KASRA + _attach(c3, vowel, tail)
+        return c1 + FATHA + c2 + VOWELS[past_vowel] + _attach(c3, vowel, tail)
+
+    def present(prefix, ending, passive):
+        vowel, tail = PRESENT_ENDINGS[ending]
+        if passive:
+            return prefix + DAMMA + c1 + SUKUN + c2 + FATHA + _attach(c3, vowel, tail)
+        return prefix + FATHA + c1 + SUKUN + c2 + VOWELS[present_vowel] + _attach(c3, vowel, tail)
+
+    return past, present
+
+
+def _doubled(c1, c2, c3, past_vowel, present_vowel):
+    def past(ending, passive):
+        vowel, tail = PAST_ENDINGS[ending]
+        first = c1 + (DAMMA if passive else FATHA)
+        if vowel == SUKUN:
+            return first + c2 + (KASRA if passive else VOWELS[past_vowel]) + _attach(c3, vowel, tail)
+        return first + c2 + SHADDA + vowel + tail
+
+    def present(prefix, ending, passive):
+        vowel, tail = PRESENT_ENDINGS[ending]
+        stem_vowel = FATHA if passive else VOWELS[present_vowel]
+        prefix += DAMMA if passive else FATHA
+        if vowel == SUKUN:
+            return prefix + c1 + SUKUN + c2 + stem_vowel + _attach(c3, vowel, tail)
+        return prefix + c1 + stem_vowel + c2 + SHADDA + vowel + tail
+
+    return past, present
+
+
+def _assimilated(c1, c2, c3, past_vowel, present_vowel):
+    sound_past, _ = _sound(c1, c2, c3, past_vowel, present_vowel)
+
+    def present(prefix, ending, passive):
+        vowel, tail = PRESENT_ENDINGS[ending]
+        if passive:
+            return prefix + DAMMA + c1 + c2 + FATHA + _attach(c3, vowel, tail)
+        # The initial waw drops out of the active present: وَعَدَ -> يَعِدُ
+        return prefix + FATHA + c2 + VOWELS[present_vowel] + _attach(c3, vowel, tail)
+
+    return sound_past, present
+
+
+def _hollow(c1, c2, c3, past_vowel, present_vowel):
+    long_vowel = {"u": "و", "i": "ي", "a": "ا"}[present_vowel]
+    # قُلْتُ for waw verbs with yafʿulu, بِعْتُ / خِفْتُ otherwise
+    short_past_vowel = DAMMA if present_vowel == "u" else KASRA
+
+    def past(ending, passive):
+        vowel, tail = PAST_ENDINGS[ending]
+        if vowel == SUKUN:
+            return c1 + (KASRA if passive else short_past_vowel) + _attach(c3, vowel, tail)
+        if passive:
+            return c1 + KASRA + "ي" + c3 + vowel + tail
+        return c1 + FATHA + "ا" + c3 + vowel + tail
+
+    def present(prefix, ending, passive):
+        vowel, tail = PRESENT_ENDINGS[ending]
+        prefix += DAMMA if passive else FATHA
+        stem_vowel = FATHA if passive else VOWELS[present_vowel]
+        if vowel == SUKUN:
+            return prefix + c1 + stem_vowel + _attach(c3, vowel, tail)
+        return prefix + c1 + stem_vowel + ("ا" if passive else long_vowel) + c3 + vowel + tail
+
+    return past, present
+
+
+def _defective(c1, c2, c3, past_vowel, present_vowel):
+    def past(ending, passive):
+        vowel, tail = PAST_ENDINGS[ending]
+        first = c1 + (DAMMA if passive else FATHA)
+        if passive or past_vowel == "i":
+            if vowel == SUKUN:
+                return first + c2 + KASRA + "ي" + tail
+            return first + c2 + DEFECTIVE_PAST_I[ending]
+        if ending == "a":
+            return first + c2 + FATHA + ("ا" if c3 == "و" else "ى")
+        if ending in ("at", "ataa"):
+            return first + c2 + FATHA + tail
+        if ending == "uu":
+            return first + c2 + FATHA + "و" + SUKUN + "ا"
+        if ending == "aa":
+            return first + c2 + FATHA + c3 + FATHA + "ا"
+        return first + c2 + FATHA + c3 + SUKUN + tail
+
+    def present(prefix, ending, passive):
+        if passive:
+            return prefix + DAMMA + c1 + SUKUN + c2 + DEFECTIVE_PRESENT["a"][ending]
+        return prefix + FATHA + c1 + SUKUN + c2 + DEFECTIVE_PRESENT[present_vowel][ending]
+
+    return past, present
+
+
+def _verb_class(word: str):
+    """
+    Resolves a verb to (root, past vowel, present vowel), or None if the engine can't handle it.
+    """
+    bare = strip_diacritics(word.strip())
+    letters = _vocalized_letters(word)
+    # An active past verb always opens with fatha; other vocalizations are nouns or other tenses
+    if letters and any(mark in letters[0] for mark in (DAMMA, KASRA, SUKUN)):
+        return None
+    # A shadda marks a derived form (عَلَّمَ, Form II) unless it is the last letter of a doubled verb (مَدَّ)
+    if any(SHADDA in letter for letter in letters[:-1]) or (letters and SHADDA in letters[-1] and len(bare) != 2):
+        return None
+    vocalized = _vocalized_past_vowel(letters)
+    fully_vocalized = _has_past_vocalization(letters)
+
+    # On any doubt the word is left to the LLM
+    if bare in NON_VERBS and not (bare in COMMON_VERBS and fully_vocalized):
+        return None
+
+    if bare in COMMON_VERBS:
+        root, past_vowel, present_vowel = COMMON_VERBS[bare]
+        # A vocalized past form overrides the table's past vowel
+        if vocalized and vocalized != past_vowel and _generator_for(root) is _sound:
+            past_vowel = vocalized
+            present_vowel = {"i": "a", "u": "u"}.get(vocalized, present_vowel)
+        return root, past_vowel, present_vowel
+
+    # Outside the table, only a fully vocalized past form (كَتَبَ, رَمَى) is trusted to be a verb
+    if not fully_vocalized:
+        return None
+    if len(bare) != 3 or any(ch in HAMZAS for ch in bare):
+        return None
+    if any(not "ء" <= ch <= "ي" for ch in bare):
+        return None
+    if bare[0] in "وي" or bare[1] in "اوىي":
+        return None
+    # A final alif marks a waw root (دعا يدعو), a final alif maqsura a ya root (رمى يرمي)
+    if bare[2] == "ا":
+        return bare[:2] + "و", "a", "u"
+    if bare[2] == "ى":
+        return bare[:2] + "ي", "a", "i"
+    if bare[2] in "وي":
+        return None
+
+    # faʿila verbs take yafʿalu and faʿula verbs take yafʿulu; faʿala is lexical
+    if vocalized == "i":
+        return bare, "i", "a"
+    if vocalized == "u":
+        return bare, "u", "u"
+    return None
+
+
+def _vocalized_letters(word: str) -> List[str]:
+    """
+    Splits a word into letters, each followed by its diacritics.
+    """
+    letters = []
+    for ch in word.strip():
+        if ch in DIACRITICS:
+            if letters:
+                letters[-1] += ch
+        else:
+            letters.append(ch)
+    return letters
+
+
+def _has_past_vocalization(letters: List[str]) -> bool:
+    """
+    True for a past form carrying fatha on the first letter and its final vowel:
+    فَعَلَ / فَعِلَ / فَعُلَ, فَعَّ (doubled), or fatha before a final alif (دَعَا, رَمَى).
+    """
+    if len(letters) < 2 or FATHA not in letters[0]:
+        return False
+    last = letters[-1]
+    if last[0] in "اى":
+        return len(letters) >= 3 and FATHA in letters[-2]
+    if len(letters) == 2:
+        return SHADDA in last and FATHA in last
+    return FATHA in last and any(mark in letters[1] for mark in VOWELS.values())
+
+
+def _vocalized_past_vowel(letters: List[str]) -> Optional[str]:
+    """
+    Reads the vowel on the second radical of a vocalized past form, if present.
+    """
+    if len(letters) < 2:
+        return None
+    for vowel, mark in VOWELS.items():
+        if mark in letters[1]:
+            return vowel
+    return None
+
+
+def _generator_for(root: str):
+    c1, c2, c3 = root
+    if c2 == c3:
+        return _doubled
+    if c1 == "و":
+        return _assimilated
+    if c2 in "وي":
+        return _hollow
+    if c3 in "وي":
+        return _defective
+    return _sound
+
+
+def conjugate_verb(word: str) -> Optional[List[dict]]:
+    """
+    Generates the full active/passive past, present and future paradigm of a Form I verb.
+
+    Returns a list of {"formRepresentations": {...}} entries in the shape produced by
+    `parse_response_to_json(..., "wordForms")`, or None if the verb isn't supported.
+    """
+    verb_class = _verb_class(word)
+    if verb_class is None:
+        return None
+    root, past_vowel, present_vowel = verb_class
+    past, present = _generator_for(root)(*root, past_vowel, present_vowel)
+
+    word_forms = []
+    for voice in ("a", "p"):
+        passive = voice == "p"
+        for aspect in ("P", "S", "F"):
+            for person, gender, number, past_ending, prefix, present_ending in SLOTS:
+                if aspect == "P":
+                    form = past(past_ending, passive)
+                else:
+                    form = present(prefix, present_ending, passive)
+                    if aspect == "F":
+                        form = FUTURE_PREFIX + form
+                word_forms.append({
+                    "formRepresentations": {
+                        "form": form,
+                        "aspect": aspect,
+                        "gender": gender,
+                        "numberWordForm": number,
+                        "person": person,
+                        "voice": voice
+                    },
+                })
+    return word_forms
@@ -0,0 +1,250 @@
+"""
+Grapheme-to-phoneme transcription of vocalized Arabic into IPA.
+
+Fully diacritized text maps almost deterministically onto phonemes, so
+`/getPhonetic` and the phonetic fields of other responses can be filled
+locally instead of asking GPT. Text with too few diacritics is rejected by
+`is_vocalized` and left to the LLM.
+"""
+from typing import List, Optional, Tuple
+
+from morphology import DAMMA, FATHA, KASRA, SHADDA, SUKUN
+
+FATHATAN = "ً"
+DAMMATAN = "ٌ"
+KASRATAN = "ٍ"
+DAGGER_ALIF = "ٰ"
+TATWEEL = "ـ"
+ALIF_WASLA = "ٱ"
+
+MARKS = {FATHA, DAMMA, KASRA, SUKUN, SHADDA, FATHATAN, DAMMATAN, KASRATAN, DAGGER_ALIF}
+SHORT_VOWELS = {FATHA: "a", DAMMA: "u", KASRA: "i", FATHATAN: "an", DAMMATAN: "un", KASRATAN: "in"}
+
+CONSONANTS = {
+    "ء": "ʔ", "أ": "ʔ", "إ": "ʔ", "ؤ": "ʔ", "ئ": "ʔ",
+    "ب": "b", "ت": "t", "ث": "θ", "ج": "dʒ", "ح": "ħ", "خ": "x",
+    "د": "d", "ذ": "ð", "ر": "r", "ز": "z", "س": "s", "ش": "ʃ",
+    "ص": "sˤ", "ض": "dˤ", "ط": "tˤ", "ظ": "ðˤ", "ع": "ʕ", "غ": "ɣ",
+    "ف": "f", "ق": "q", "ك": "k", "ل": "l", "م": "m", "ن": "n",
+    "ه": "h", "و": "w", "ي": "j", "ة": "t",
+}
+# Letters the definite article assimilates to (ٱلشَّمْس -> ʔaʃʃams)
+SUN_LETTERS = set("تثدذرزسشصضطظلن")
+# Letters that normally carry no diacritic of their own
+VOWEL_LETTERS = set("اىوي")
+# One-letter prefixes that can precede the article, with the vowel they carry
+PROCLITICS = {"و": FATHA, "ف": FATHA, "ك": FATHA, "ب": KASRA, "ل": KASRA}
+
+VOCALIZATION_THRESHOLD = 0.75
+
+
+def _split_letters(word: str) -> List[Tuple[str, str]]:
+    """
+    Splits a word into (letter, diacritics) pairs.
+    """
+    letters = []
+    for ch in word:
+        if ch == TATWEEL:
+            continue
+        if ch in MARKS:
+            if letters:
+                letters[-1] = (letters[-1][0], letters[-1][1] + ch)
+        else:
+            letters.append((ch, ""))
+    return letters
+
+
+def _article_span(letters) -> Optional[Tuple[int, int]]:
+    """
+    (start, end) letter indices of the definite article, or None if the word has none.
+
+    The article may follow a one-letter proclitic (وَالشَّمْسِ, بِالْقَلَمِ), and after لِ it
+    loses its alif (لِلْقَلَمِ).
+    """
+    if len(letters) > 3 and letters[0][0] in ("ا", ALIF_WASLA) and letters[1][0] == "ل" and not letters[0][1]:
+        return 0, 2
+    if len(letters) < 5 or PROCLITICS.get(letters[0][0]) != letters[0][1]:
+        return None
+    if letters[0][0] == "ل" and letters[1][0] == "ل":
+        start, lam = 1, 1
+    elif letters[1][0] in ("ا", ALIF_WASLA) and not letters[1][1] and letters[2][0] == "ل":
+        start, lam = 1, 2
+    else:
+        return None
+    # A vowelled lam is a root letter (وَالِدٌ), not the article
+    if letters[lam][1] not in ("", SUKUN) or len(letters) - lam < 3:
+        return None
+    return start, lam + 1
+
+
+def _arabic_words(text: str):
+    """
+    Yields the letters of every word in the text made up of Arabic letters only.
+    """
+    for word in text.split():
+        letters = _split_letters(word)
+        if all(ch in CONSONANTS or ch in VOWEL_LETTERS or ch in ("آ", ALIF_WASLA) for ch, _ in letters):
+            yield letters
+
+
+def vocalization_ratio(text: str) -> float:
+    """
+    Share of the letters that should carry a diacritic and do.
+
+    Vowel letters, the definite article and each word's last letter (case endings
+    are often left off) are not counted.
+    """
+    expected = marked = 0
+    for letters in _arabic_words(text):
+        article = _article_span(letters) or (0, 0)
+        for index, (ch, marks) in enumerate(letters[:-1]):
+            if article[0] <= index < article[1]:
+                continue
+            if (ch in VOWEL_LETTERS and not marks) or ch in ("آ", ALIF_WASLA):
+                continue
+            expected += 1
+            marked += bool(marks)
+    return marked / expected if expected else 0.0
+
+
+def _vowel_letters_resolved(letters) -> bool:
+    """
+    True if every undiacritized vowel letter can be read from the vowel before it: و after
+    damma or fatha, ي after kasra or fatha, an alif after anything but kasra, damma or sukun.
+    Otherwise the letter may be a consonant whose vowel was left off (السُيوفِ).
+    """
+    article = _article_span(letters) or (0, 0)
+    for index, (ch, marks) in enumerate(letters):
+        if marks or ch not in VOWEL_LETTERS or article[0] <= index < article[1]:
+            continue
+        if index == 0:
+            # A leading alif is hamzat al-wasl; a leading و or ي needs its own vowel
+            if ch in ("و", "ي"):
+                return False
+            continue
+        previous = letters[index - 1][1]
+        if ch == "و" and not (DAMMA in previous or FATHA in previous):
+            return False
+        if ch == "ي" and not (KASRA in previous or FATHA in previous):
+            return False
+        if ch in ("ا", "ى") and any(mark in previous for mark in (KASRA, DAMMA, SUKUN)):
+            return False
+    return True
+
+
+def is_vocalized(text: Optional[str]) -> bool:
+    """
+    True if the text is Arabic with enough diacritics to be transcribed locally
+    and no vowel letter left ambiguous.
+    """
+    if not text or not isinstance(text, str):
+        return False
+    if not all(_vowel_letters_resolved(letters) for letters in _arabic_words(text)):
+        return False
+    return vocalization_ratio(text) >= VOCALIZATION_THRESHOLD
+
+
+def _transcribe_word(word: str, utterance_initial: bool, utterance_final: bool) -> str:
+    letters = _split_letters(word)
+    out = []
+    start = 0
+    geminate_next = False
+
+    article = _article_span(letters)
+    if article is not None:
+        article_start, start = article
+        if article_start:
+            # The proclitic takes the place of the article's alif, which stays silent
+            ch, marks = letters[0]
+            out.append(CONSONANTS[ch] + SHORT_VOWELS[marks])
+        else:
+            # Hamzat al-wasl is only pronounced at the start of the utterance
+            out.append("ʔa" if utterance_initial else "")
+        if letters[start][0] in SUN_LETTERS:
+            geminate_next = True
+        else:
+            out.append("l")
+
+    for index in range(start, len(letters)):
+        ch, marks = letters[index]
+        is_last = index == len(letters) - 1
+        previous = out[-1] if out else ""
+        vowel = next((SHORT_VOWELS[mark] for mark in marks if mark in SHORT_VOWELS), "")
+
+        if ch == "آ":
+            out.append("ʔaː")
+            continue
+
+        if ch in ("ا", "ى", ALIF_WASLA) and not (SHADDA in marks or SUKUN in marks):
+            if index == 0:
+                # Hamzat al-wasl of a verb or noun outside the article
+                out.append(("ʔ" + (vowel or "i")) if utterance_initial else "")
+            elif FATHATAN in marks:
+                out.append("an")
+            elif previous.endswith("a") and not previous.endswith("an"):
+                out[-1] = previous + "ː"
+            elif previous.endswith("an") or (is_last and letters[index - 1][0] == "و"):
+                # Alif after tanwin, or the silent alif of the plural -uu (كَتَبُوا)
+                continue
+            else:
+                out.append("aː")
+            continue
+
+        if ch in ("و", "ي") and not marks and index > start:
+            if ch == "و" and previous.endswith("u"):
+                out[-1] = previous + "ː"
+            elif ch == "ي" and previous.endswith("i"):
+                out[-1] = previous + "ː"
+            else:
+                # Diphthong after fatha, or an unvocalized consonant
+                out.append(CONSONANTS[ch])
+            continue
+
+        if ch == "ة" and is_last and utterance_final:
+            # Taa marbuta is read in pause: -atun -> -a
+            continue
+
+        consonant = CONSONANTS.get(ch)
+        if consonant is None:
+            continue
+        if SHADDA in marks or geminate_next:
+            consonant += consonant
+        geminate_next = False
+
+        if ch in ("أ", "إ") and not vowel:
+            vowel = "a" if ch == "أ" else "i"
+        if DAGGER_ALIF in marks:
+            # Superscript alif lengthens the fatha (هٰذَا -> haːðaː)
+            vowel = (vowel or "a") + "ː"
+        out.append(consonant + vowel)
+
+    return "".join(out)
+
+
+def transcribe(text: str) -> str:
+    """
+    Transcribes vocalized Arabic text into IPA, e.g. "ضَرِيبَةٌ" -> "/dˤariːba/".
+    """
+    words = [word for word in text.split() if _split_letters(word)]
+    transcribed = [
+        _transcribe_word(word, index == 0, index == len(words) - 1)
+        for index, word in enumerate(words)
+    ]
+    return "/" + " ".join(word for word in transcribed if word) + "/"
+
+
+def fill_phonetic_fields(value):
+    """
+    Replaces the phonetic of every {"form", "phonetic"} entry in a parsed response whose
+    form is vocalized with the local transcription. Entries are updated in place.
+    """
+    if isinstance(value, list):
+        for item in value:
+            fill_phonetic_fields(item)
+    elif isinstance(value, dict):
+        if "form" in value and "phonetic" in value and is_vocalized(value["form"]):
+            value["phonetic"] = transcribe(value["form"])
+        for item in value.values():
+            if isinstance(item, (dict, list)):
+                fill_phonetic_fields(item)
+    return value
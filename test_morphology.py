@@ -0,0 +1,40 @@
+import pytest
+
+from morphology import FATHA, conjugate_verb, strip_diacritics
+
+
+def past_3ms(word):
+    return conjugate_verb(word)[0]["formRepresentations"]["form"]
+
+
+@pytest.mark.parametrize("word, expected", [
+    ("كَتَبَ", "كَتَبَ"),
+    ("ضرب", "ضَرَبَ"),
+    ("مد", "مَدّ" + FATHA),
+    ("مَدَّ", "مَدّ" + FATHA),
+    ("فَهِمَ", "فَهِمَ"),
+    ("قال", "قَالَ"),
+    ("دعا", "دَعَا"),
+])
+def test_conjugates_form_i_verbs(word, expected):
+    assert len(conjugate_verb(word)) == 96
+    assert past_3ms(word) == expected
+
+
+@pytest.mark.parametrize("word", [
+    # Form II: shadda on the middle radical
+    "عَلَّمَ",
+    "دَرَّسَ",
+    "كَسَّرَ",
+    # Particles and nouns
+    "على",
+    "كتب",
+    "عَلَى",
+    "مَلِكٌ",
+])
+def test_leaves_other_words_to_the_llm(word):
+    assert conjugate_verb(word) is None
+
+
+def test_forms_are_diacritized_versions_of_the_root():
+    assert strip_diacritics(past_3ms("وعد")) == "وعد"
@@ -0,0 +1,51 @@
+import pytest
+
+from phonetics import fill_phonetic_fields, is_vocalized, transcribe
+
+TRANSCRIPTIONS = [
+    ("ضَرِيبَةٌ", "/dˤariːba/"),
+    ("الشَّمْسُ", "/ʔaʃʃamsu/"),
+    ("ذَهَبَ الْوَلَدُ", "/ðahaba lwaladu/"),
+    # The article after a proclitic: silent alif, assimilated lam before sun letters
+    ("وَالشَّمْسِ", "/waʃʃamsi/"),
+    ("وَالْعَصْرِ", "/walʕasˤri/"),
+    ("بِالْقَلَمِ", "/bilqalami/"),
+    ("فَالْكِتَابُ", "/falkitaːbu/"),
+    ("لِلْقَلَمِ", "/lilqalami/"),
+    ("لِلشَّمْسِ", "/liʃʃamsi/"),
+    # A vowelled lam after the alif is a root letter, not the article
+    ("وَالِدٌ", "/waːlidun/"),
+    ("أَحِنُّ إِلَى ضَرْبِ السُّيُوفِ الْقَوَاضِبِ", "/ʔaħinnu ʔilaː dˤarbi ssujuːfi lqawaːdˤibi/"),
+    ("كَتَبُوا", "/katabuː/"),
+    ("بَيْتٌ", "/bajtun/"),
+]
+
+
+@pytest.mark.parametrize("text, expected", TRANSCRIPTIONS)
+def test_transcribe(text, expected):
+    assert is_vocalized(text)
+    assert transcribe(text) == expected
+
+
+NOT_VOCALIZED = [
+    "كتب",
+    "مدرسة",
+    # Undiacritized و/ي that the transcription would read as consonants
+    "أَحِنُّ إِلى ضَربِ السُيوفِ القَواضِبِ",
+    "السُيوفِ",
+    "وصَلَ",
+    "",
+    None,
+]
+
+
+@pytest.mark.parametrize("text", NOT_VOCALIZED)
+def test_not_vocalized(text):
+    assert not is_vocalized(text)
+
+
+def test_fill_phonetic_fields_keeps_llm_phonetic_of_ambiguous_forms():
+    entry = {"form": "السُيوفِ", "phonetic": "/assujuːfi/"}
+    assert fill_phonetic_fields(entry)["phonetic"] == "/assujuːfi/"
+    entry = {"form": "السُّيُوفِ", "phonetic": "/assujuːfi/"}
+    assert fill_phonetic_fields(entry)["phonetic"] == "/ʔassujuːfi/"